@@ -429,10 +429,7 @@ with tab1:
             worst_display.columns = ['System', 'City', 'Violations', 'Health']
             
             # Add grade column
-            worst_display['Grade'] = worst_display.apply(
-                lambda row: '🔴 F' if row['Health'] > 0 else '🟡 D', 
-                axis=1
-            )
+            worst_display['Grade'] = worst_display['Health'].gt(0).map({True: '🔴 F', False: '🟡 D'})
             
             # Reorder columns
             worst_display = worst_display[['Grade', 'System', 'City', 'Violations']]
@@ -3,6 +3,7 @@ import pandas as pd
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from utils.database import CITY_SUMMARY_SQL
 
 load_dotenv()
 
@@ -111,6 +112,10 @@ def create_database():
         GROUP BY p.PWSID
     """)
     
+    # City summary table for per-city lookups
+    for sql in CITY_SUMMARY_SQL:
+        cursor.execute(sql)
+    
     conn.commit()
     conn.close()
     
@@ -9,7 +9,9 @@ class VoiceInterface {
         this.audioContext = null;
         this.isRecording = false;
         this.audioQueue = [];
+        this.nextPlayTime = 0;
         this.audioWorkletNode = null;
+        this.analyser = null;
         this.stream = null;
         
         // Audio settings for OpenAI Realtime API
@@ -73,6 +75,11 @@ class VoiceInterface {
             }
         };
         
+        // Level tap for the visualizer; a 32-point FFT gives 16 bins for the 8 bars
+        this.analyser = this.audioContext.createAnalyser();
+        this.analyser.fftSize = 32;
+        source.connect(this.analyser);
+        
         // Connect audio nodes
         source.connect(scriptProcessor);
         scriptProcessor.connect(this.audioContext.destination);
@@ -155,6 +162,36 @@ class VoiceInterface {
         }
     }
     
+    playAudioSequence(audioDataList) {
+        if (!this.audioContext) return;
+        
+        try {
+            // Schedule the chunks back to back on the context clock
+            let startTime = Math.max(this.audioContext.currentTime, this.nextPlayTime);
+            
+            for (const audioData of audioDataList) {
+                const float32Data = this.pcm16ToFloat32(audioData);
+                const audioBuffer = this.audioContext.createBuffer(
+                    1, // mono
+                    float32Data.length,
+                    this.sampleRate
+                );
+                audioBuffer.getChannelData(0).set(float32Data);
+                
+                const source = this.audioContext.createBufferSource();
+                source.buffer = audioBuffer;
+                source.connect(this.audioContext.destination);
+                source.start(startTime);
+                startTime += audioBuffer.duration;
+            }
+            
+            this.nextPlayTime = startTime;
+            
+        } catch (error) {
+            console.error('Error playing audio:', error);
+        }
+    }
+    
     cleanup() {
         if (this.stream) {
             this.stream.getTracks().forEach(track => track.stop());
@@ -163,18 +200,20 @@ class VoiceInterface {
             this.audioContext.close();
         }
         this.mediaRecorder = null;
+        this.analyser = null;
         this.audioContext = null;
         this.isRecording = false;
     }
 }
 
 // Streamlit component communication
-function sendMessageToStreamlit(type, data) {
+// Buffers listed in `transfer` are moved to the receiver instead of copied
+function sendMessageToStreamlit(type, data, transfer = []) {
     if (window.parent && window.parent.postMessage) {
         window.parent.postMessage({
             type: type,
             data: data
-        }, '*');
+        }, '*', transfer);
     }
 }
 
@@ -186,10 +225,10 @@ async function initVoice() {
     voiceInterface = new VoiceInterface();
     
     voiceInterface.onAudioData = (audioData) => {
-        // Send audio data to Streamlit
+        // Send raw PCM16 to Streamlit; postMessage carries binary, so skip base64
         sendMessageToStreamlit('audio_data', {
-            audio: arrayBufferToBase64(audioData)
-        });
+            audio: audioData
+        }, [audioData]);
     };
     
     voiceInterface.onError = (error) => {
@@ -230,6 +269,13 @@ function playAudio(base64Audio) {
     }
 }
 
+// Play several base64 chunks from Streamlit in order, from a single script tag
+function playAudioSequence(base64Chunks) {
+    if (voiceInterface) {
+        voiceInterface.playAudioSequence(base64Chunks.map(base64ToArrayBuffer));
+    }
+}
+
 // Utility functions
 function arrayBufferToBase64(buffer) {
     const bytes = new Uint8Array(buffer);
@@ -267,6 +313,9 @@ window.addEventListener('message', (event) => {
         case 'play_audio':
             playAudio(message.audio);
             break;
+        case 'play_audio_sequence':
+            playAudioSequence(message.audio);
+            break;
         case 'cleanup':
             if (voiceInterface) {
                 voiceInterface.cleanup();
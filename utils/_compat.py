@@ -0,0 +1,14 @@
+"""
+Optional-dependency shims shared across the utils modules
+"""
+
+# pybase64 is a faster drop-in for the stdlib base64 codec when it is installed
+try:
+    from pybase64 import b64encode, b64decode, b64encode_as_string
+except ImportError:
+    from base64 import b64encode, b64decode
+
+    def b64encode_as_string(s: bytes) -> str:
+        return b64encode(s).decode('ascii')
+
+__all__ = ['b64encode', 'b64decode', 'b64encode_as_string']
@@ -165,27 +165,31 @@ class AIInsights:
             return "OpenAI API not configured. Add your OPENAI_API_KEY to .env file for AI insights."
         
         try:
-            context_str = ""
-            if context:
-                context_str = f"\nContext: {context}"
-            
-            messages = [
-                {"role": "developer", "content": "You are a helpful assistant for Georgia residents concerned about their drinking water quality. Provide accurate, helpful responses in plain language."},
-                {"role": "user", "content": f"{question}{context_str}"}
-            ]
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4.1",
-                messages=messages,
-                max_tokens=500,
-                temperature=0.3
-            )
-            
-            return response.choices[0].message.content
+            return self.ask(question, context)
             
         except Exception as e:
             return f"Error getting AI response: {str(e)}"
     
+    def ask(self, question: str, context: Optional[Dict[str, Any]] = None) -> str:
+        """Like chat_query, but API errors propagate instead of becoming the answer text"""
+        context_str = ""
+        if context:
+            context_str = f"\nContext: {context}"
+        
+        messages = [
+            {"role": "developer", "content": "You are a helpful assistant for Georgia residents concerned about their drinking water quality. Provide accurate, helpful responses in plain language."},
+            {"role": "user", "content": f"{question}{context_str}"}
+        ]
+        
+        response = self.client.chat.completions.create(
+            model="gpt-4.1",
+            messages=messages,
+            max_tokens=500,
+            temperature=0.3
+        )
+        
+        return response.choices[0].message.content
+    
     def get_city_insights(self, city_name: str, city_context: str, question: str, violations_data: Any = None) -> str:
         """Get AI insights about water quality in a specific city"""
         if not self.enabled:
@@ -7,9 +7,31 @@ from dotenv import load_dotenv
 load_dotenv()
 DATABASE_PATH = os.getenv('DATABASE_PATH', 'georgia_water.db')
 
+# Per-city summary so city lookups skip the violations join. Violations are counted
+# per system first so population is not multiplied by the join.
+CITY_SUMMARY_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS city_water_summary AS
+    SELECT 
+        UPPER(p.CITY_NAME) as city_upper,
+        COUNT(*) as systems,
+        SUM(p.POPULATION_SERVED_COUNT) as population,
+        SUM(COALESCE(v.violations, 0)) as violations
+    FROM pub_water_systems p
+    LEFT JOIN (
+        SELECT PWSID, COUNT(DISTINCT VIOLATION_ID) as violations
+        FROM violations_enforcement
+        GROUP BY PWSID
+    ) v ON p.PWSID = v.PWSID
+    GROUP BY UPPER(p.CITY_NAME)
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_city_summary_city ON city_water_summary(city_upper)",
+]
+
 class WaterDatabase:
     def __init__(self):
         self.db_path = DATABASE_PATH
+        self._city_summary_ready = False
         
     def get_connection(self):
         """Get database connection"""
@@ -290,6 +312,25 @@ class WaterDatabase:
         """
         return self.query_df(query, (pwsid,))
     
+    def get_city_summary(self, city: str) -> pd.DataFrame:
+        """Systems, population and violations for cities matching the name"""
+        if not self._city_summary_ready:
+            # Databases built before the summary table existed get it on first use
+            with self.get_connection() as conn:
+                for sql in CITY_SUMMARY_SQL:
+                    conn.execute(sql)
+            self._city_summary_ready = True
+        
+        query = """
+        SELECT 
+            SUM(systems) as systems,
+            SUM(population) as population,
+            SUM(violations) as violations
+        FROM city_water_summary
+        WHERE city_upper LIKE ?
+        """
+        return self.query_df(query, (f"%{city.upper()}%",))
+    
     def get_reference_codes(self, value_type: str) -> pd.DataFrame:
         """Get reference code descriptions"""
         query = """
@@ -4,16 +4,29 @@ Creates water quality awareness memes with custom captions
 """
 
 import os
-import base64
 import requests
 import time
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from PIL import Image
 import io
 from dotenv import load_dotenv
+from ._compat import b64decode, b64encode_as_string
 
 load_dotenv()
 
+# Text bounding boxes keyed by (font_size, text), reused across fallback renders
+_BBOX_CACHE: Dict[Tuple[int, str], Tuple[int, int, int, int]] = {}
+_BBOX_CACHE_MAX = 1024
+
+_TEMPLATE_SUGGESTIONS = {
+    "violations": ("drake", "expanding_brain", "astronaut", "two_buttons"),
+    "safety": ("change_my_mind", "woman_yelling_at_cat", "surprised_pikachu"),
+    "awareness": ("distracted_boyfriend", "is_this_a_pigeon", "one_does_not_simply"),
+    "humor": ("mock_spongebob", "arthur_fist", "hide_the_pain_harold"),
+    "urgent": ("ackbar", "panik-kalm-panik", "american_chopper_argument")
+}
+_DEFAULT_TEMPLATE_SUGGESTIONS = ("drake", "distracted_boyfriend", "two_buttons")
+
 class MemeGenerator:
     """Generate memes using Flux Kontext API"""
     
@@ -22,17 +35,20 @@ class MemeGenerator:
         self.base_url = "https://api.bfl.ai"
         self.enabled = bool(self.api_key)
         
+        # Shared session keeps the TCP/TLS connection alive across the create/poll requests
+        self.session = requests.Session()
+        
         if not self.enabled:
             print("BFL API key not found. Meme generation will use fallback method.")
     
     def image_to_base64(self, image_path: str) -> str:
         """Convert image file to base64 string"""
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            return b64encode_as_string(image_file.read())
     
     def base64_to_image(self, base64_string: str) -> Image.Image:
         """Convert base64 string to PIL Image"""
-        image_data = base64.b64decode(base64_string)
+        image_data = b64decode(base64_string)
         return Image.open(io.BytesIO(image_data))
     
     def generate_meme(self, template_path: str, caption: str, position: str = "top") -> Optional[bytes]:
@@ -77,7 +93,7 @@ class MemeGenerator:
             }
             
             # Send request to create task
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/v1/flux-kontext-pro",
                 headers=headers,
                 json=data
@@ -103,7 +119,7 @@ class MemeGenerator:
                 
                 if image_url:
                     # Download the generated image
-                    img_response = requests.get(image_url)
+                    img_response = self.session.get(image_url)
                     if img_response.status_code == 200:
                         return img_response.content
                     else:
@@ -127,7 +143,7 @@ class MemeGenerator:
         
         for _ in range(max_attempts):
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{self.base_url}/v1/get_result",
                     headers=headers,
                     params={"id": task_id}
@@ -160,7 +176,7 @@ class MemeGenerator:
             from PIL import ImageDraw, ImageFont
             
             # Open the template
-            img = Image.open(template_path).convert("RGBA")
+            img = Image.open(template_path).convert("RGB")
             draw = ImageDraw.Draw(img)
             
             # Try to use Impact font, fallback to default
@@ -181,8 +197,13 @@ class MemeGenerator:
                 texts = [(caption, position)]
             
             for text, pos in texts:
-                # Get text size
-                bbox = draw.textbbox((0, 0), text, font=font)
+                # Get text size (cached, captions are often re-rendered unchanged)
+                key = (font_size, text)
+                bbox = _BBOX_CACHE.get(key)
+                if bbox is None:
+                    if len(_BBOX_CACHE) >= _BBOX_CACHE_MAX:
+                        _BBOX_CACHE.clear()
+                    bbox = _BBOX_CACHE[key] = draw.textbbox((0, 0), text, font=font)
                 text_width = bbox[2] - bbox[0]
                 text_height = bbox[3] - bbox[1]
                 
@@ -215,12 +236,4 @@ class MemeGenerator:
     
     def get_suggested_templates(self, topic: str) -> list:
         """Get suggested meme templates for a given topic"""
-        suggestions = {
-            "violations": ["drake", "expanding_brain", "astronaut", "two_buttons"],
-            "safety": ["change_my_mind", "woman_yelling_at_cat", "surprised_pikachu"],
-            "awareness": ["distracted_boyfriend", "is_this_a_pigeon", "one_does_not_simply"],
-            "humor": ["mock_spongebob", "arthur_fist", "hide_the_pain_harold"],
-            "urgent": ["ackbar", "panik-kalm-panik", "american_chopper_argument"]
-        }
-        
-        return suggestions.get(topic, ["drake", "distracted_boyfriend", "two_buttons"])
\ No newline at end of file
+        return list(_TEMPLATE_SUGGESTIONS.get(topic, _DEFAULT_TEMPLATE_SUGGESTIONS))
\ No newline at end of file
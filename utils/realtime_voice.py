@@ -4,8 +4,6 @@ Provides speech-to-speech interaction for water quality queries
 """
 
 import os
-import json
-import base64
 import time
 import websocket
 import threading
@@ -14,9 +12,65 @@ from queue import Queue
 import streamlit as st
 from streamlit.runtime.scriptrunner import add_script_run_ctx
 from dotenv import load_dotenv
+from ._compat import b64decode, b64encode_as_string
+
+# websocket-client accepts either str or bytes text frames, so both dumps variants work
+try:
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    from json import dumps as json_dumps, loads as json_loads
 
 load_dotenv()
 
+_SESSION_INSTRUCTIONS = (
+    "You are a helpful water quality assistant for Georgia residents.\n"
+    "You help people understand their drinking water quality, violations, and safety concerns.\n"
+    "Keep responses concise and clear. Focus on the most important information.\n"
+    "If the user mentions a specific city or water system, use that context in your response.\n"
+    "Always provide practical advice when discussing water quality issues."
+)
+
+# Constant messages are serialized once at import instead of on every send
+_SESSION_CONFIG = json_dumps({
+    "type": "session.update",
+    "session": {
+        "modalities": ["text", "audio"],
+        "instructions": _SESSION_INSTRUCTIONS,
+        "voice": "alloy",
+        "input_audio_format": "pcm16",
+        "output_audio_format": "pcm16",
+        "input_audio_transcription": {
+            "model": "whisper-1"
+        },
+        "turn_detection": {
+            "type": "server_vad",
+            "threshold": 0.5,
+            "prefix_padding_ms": 300,
+            "silence_duration_ms": 200
+        },
+        "temperature": 0.8,
+        "max_response_output_tokens": 4096
+    }
+})
+_RESPONSE_CREATE = json_dumps({"type": "response.create"})
+_RESPONSE_CANCEL = json_dumps({"type": "response.cancel"})
+_AUDIO_BUFFER_COMMIT = json_dumps({"type": "input_audio_buffer.commit"})
+_AUDIO_BUFFER_CLEAR = json_dumps({"type": "input_audio_buffer.clear"})
+
+def _input_text_item(role: str, text: str) -> dict:
+    """Build a conversation.item.create message with a single input_text part"""
+    return {
+        "type": "conversation.item.create",
+        "item": {
+            "type": "message",
+            "role": role,
+            "content": [{
+                "type": "input_text",
+                "text": text
+            }]
+        }
+    }
+
 class RealtimeVoiceAssistant:
     """Handle real-time voice interactions using OpenAI Realtime API"""
     
@@ -28,16 +82,19 @@ class RealtimeVoiceAssistant:
         self.response_callback = None
         self.transcript_callback = None
         self.error_callback = None
+        self.done_callback = None
         self.context = {}
         
         # WebSocket URL with model
         self.url = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-12-17"
         
-    def connect(self, on_response: Callable = None, on_transcript: Callable = None, on_error: Callable = None):
+    def connect(self, on_response: Callable = None, on_transcript: Callable = None, on_error: Callable = None,
+                on_done: Callable = None):
         """Connect to OpenAI Realtime API"""
         self.response_callback = on_response
         self.transcript_callback = on_transcript
         self.error_callback = on_error
+        self.done_callback = on_done
         
         headers = [
             f"Authorization: Bearer {self.api_key}",
@@ -73,33 +130,7 @@ class RealtimeVoiceAssistant:
         self.is_connected = True
         
         # Configure session for water quality assistant
-        session_config = {
-            "type": "session.update",
-            "session": {
-                "modalities": ["text", "audio"],
-                "instructions": """You are a helpful water quality assistant for Georgia residents. 
-                You help people understand their drinking water quality, violations, and safety concerns.
-                Keep responses concise and clear. Focus on the most important information.
-                If the user mentions a specific city or water system, use that context in your response.
-                Always provide practical advice when discussing water quality issues.""",
-                "voice": "alloy",
-                "input_audio_format": "pcm16",
-                "output_audio_format": "pcm16",
-                "input_audio_transcription": {
-                    "model": "whisper-1"
-                },
-                "turn_detection": {
-                    "type": "server_vad",
-                    "threshold": 0.5,
-                    "prefix_padding_ms": 300,
-                    "silence_duration_ms": 200
-                },
-                "temperature": 0.8,
-                "max_response_output_tokens": 4096
-            }
-        }
-        
-        self.send_message(session_config)
+        self._send_encoded(_SESSION_CONFIG)
         
         # Send initial context if available
         if self.context:
@@ -108,7 +139,7 @@ class RealtimeVoiceAssistant:
     def on_message(self, ws, message):
         """Handle incoming WebSocket messages"""
         try:
-            data = json.loads(message)
+            data = json_loads(message)
             event_type = data.get('type', '')
             
             if event_type == 'session.created':
@@ -124,7 +155,7 @@ class RealtimeVoiceAssistant:
                 # Handle audio chunks
                 audio_base64 = data.get('delta', '')
                 if audio_base64 and self.response_callback:
-                    audio_bytes = base64.b64decode(audio_base64)
+                    audio_bytes = b64decode(audio_base64)
                     self.response_callback(audio_bytes)
                     
             elif event_type == 'response.audio_transcript.delta':
@@ -141,6 +172,8 @@ class RealtimeVoiceAssistant:
                 
             elif event_type == 'response.done':
                 # Response completed
+                if self.done_callback:
+                    self.done_callback()
                 if self.transcript_callback:
                     self.transcript_callback('complete', '')
                     
@@ -172,7 +205,12 @@ class RealtimeVoiceAssistant:
     def send_message(self, message: dict):
         """Send message to the API"""
         if self.ws and self.is_connected:
-            self.ws.send(json.dumps(message))
+            self.ws.send(json_dumps(message))
+    
+    def _send_encoded(self, payload):
+        """Send a message that was already serialized with json_dumps"""
+        if self.ws and self.is_connected:
+            self.ws.send(payload)
     
     def send_audio(self, audio_bytes: bytes):
         """Send audio data to the API"""
@@ -180,7 +218,12 @@ class RealtimeVoiceAssistant:
             return
         
         # Convert audio to base64
-        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+        self.send_audio_base64(b64encode_as_string(audio_bytes))
+    
+    def send_audio_base64(self, audio_base64: str):
+        """Send audio that is already base64 encoded, as the API expects it"""
+        if not self.is_connected:
+            return
         
         # Send audio buffer
         message = {
@@ -193,12 +236,12 @@ class RealtimeVoiceAssistant:
     def commit_audio(self):
         """Commit the audio buffer for processing"""
         if self.is_connected:
-            self.send_message({"type": "input_audio_buffer.commit"})
+            self._send_encoded(_AUDIO_BUFFER_COMMIT)
     
     def clear_audio(self):
         """Clear the audio buffer"""
         if self.is_connected:
-            self.send_message({"type": "input_audio_buffer.clear"})
+            self._send_encoded(_AUDIO_BUFFER_CLEAR)
     
     def send_text(self, text: str):
         """Send text message"""
@@ -206,22 +249,10 @@ class RealtimeVoiceAssistant:
             return
         
         # Create conversation item
-        message = {
-            "type": "conversation.item.create",
-            "item": {
-                "type": "message",
-                "role": "user",
-                "content": [{
-                    "type": "input_text",
-                    "text": text
-                }]
-            }
-        }
-        
-        self.send_message(message)
+        self.send_message(_input_text_item("user", text))
         
         # Trigger response
-        self.send_message({"type": "response.create"})
+        self._send_encoded(_RESPONSE_CREATE)
     
     def update_context(self, context: Dict[str, Any]):
         """Update conversation context"""
@@ -229,36 +260,24 @@ class RealtimeVoiceAssistant:
         
         if self.is_connected and context:
             # Build context message
-            context_text = "Current context:\n"
+            lines = ["Current context:"]
             
             if 'city_name' in context:
-                context_text += f"- User is asking about {context['city_name']}\n"
+                lines.append(f"- User is asking about {context['city_name']}")
             
             if 'water_system' in context:
                 system = context['water_system']
-                context_text += f"- Water System: {system.get('name', 'Unknown')}\n"
-                context_text += f"- Population Served: {system.get('population', 'Unknown')}\n"
-                context_text += f"- Active Violations: {system.get('violations', 'Unknown')}\n"
+                lines.append(f"- Water System: {system.get('name', 'Unknown')}")
+                lines.append(f"- Population Served: {system.get('population', 'Unknown')}")
+                lines.append(f"- Active Violations: {system.get('violations', 'Unknown')}")
             
             # Send context as system message
-            message = {
-                "type": "conversation.item.create",
-                "item": {
-                    "type": "message",
-                    "role": "system",
-                    "content": [{
-                        "type": "input_text",
-                        "text": context_text
-                    }]
-                }
-            }
-            
-            self.send_message(message)
+            self.send_message(_input_text_item("system", "\n".join(lines) + "\n"))
     
     def interrupt(self):
         """Interrupt the current response"""
         if self.is_connected:
-            self.send_message({"type": "response.cancel"})
+            self._send_encoded(_RESPONSE_CANCEL)
     
     def disconnect(self):
         """Disconnect from the API"""
@@ -3,10 +3,76 @@ System Report Card Generator
 Creates A-F grades for water systems based on violations and compliance
 """
 
-from typing import Dict, List, Tuple
+import hashlib
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 import pandas as pd
+import streamlit as st
 from datetime import datetime, timedelta
 
+_GRADE_COLOR_CLASSES = {
+    'A': 'excellent',  # Green
+    'B': 'good',       # Blue
+    'C': 'fair',       # Yellow
+    'D': 'poor',       # Orange
+    'F': 'critical'    # Red
+}
+
+# Grading rules, checked in order; explanations are formatted with the metrics dict
+_GRADE_RULES = [
+    # Active health violations = automatic D or F
+    (lambda m: m['active_health'] >= 3, {
+        'grade': 'F', 'score': 30, 'color': 'danger', 'status': 'Critical',
+        'explanation': '{active_health} active health-based violations', 'emoji': '🚨'
+    }),
+    (lambda m: m['active_health'] > 0, {
+        'grade': 'D', 'score': 50, 'color': 'warning', 'status': 'Poor',
+        'explanation': '{active_health} active health violation(s)', 'emoji': '⚠️'
+    }),
+    # Active non-health violations
+    (lambda m: m['active_violations'] >= 5, {
+        'grade': 'D', 'score': 55, 'color': 'warning', 'status': 'Poor',
+        'explanation': '{active_violations} active violations', 'emoji': '⚠️'
+    }),
+    (lambda m: m['active_violations'] > 0, {
+        'grade': 'C', 'score': 70, 'color': 'info', 'status': 'Fair',
+        'explanation': '{active_violations} active violation(s)', 'emoji': '📋'
+    }),
+    # Recent but resolved violations
+    (lambda m: m['recent_violations'] > 0 and m['resolution_rate'] >= 90, {
+        'grade': 'B', 'score': 85, 'color': 'primary', 'status': 'Good',
+        'explanation': '{recent_violations} recent violations, {resolution_rate:.0f}% resolved', 'emoji': '✅'
+    }),
+    (lambda m: m['recent_violations'] > 0, {
+        'grade': 'C', 'score': 75, 'color': 'info', 'status': 'Fair',
+        'explanation': '{recent_violations} recent violations, {resolution_rate:.0f}% resolved', 'emoji': '📋'
+    }),
+    # Old violations only
+    (lambda m: m['total_violations'] <= 3, {
+        'grade': 'A', 'score': 95, 'color': 'success', 'status': 'Excellent',
+        'explanation': 'Only minor historical violations', 'emoji': '🌟'
+    }),
+    (lambda m: True, {
+        'grade': 'B', 'score': 80, 'color': 'primary', 'status': 'Good',
+        'explanation': '{total_violations} historical violations, all resolved', 'emoji': '✅'
+    }),
+]
+
+@lru_cache(maxsize=1)
+def _two_years_ago(hour_bucket: int) -> datetime:
+    """Cutoff for recent violations, recomputed at most once per hour bucket"""
+    return datetime.now() - timedelta(days=730)
+
+def _parse_violation_date(value) -> Optional[datetime]:
+    """Parse a SDWIS MM/DD/YYYY date, returning None if it is missing or invalid"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value, '%m/%d/%Y')
+    except (TypeError, ValueError):
+        return None
+
 def calculate_system_grade(system_data: dict) -> Dict[str, any]:
     """
     Calculate A-F grade for a water system based on violations and compliance
@@ -36,129 +102,83 @@ def calculate_system_grade(system_data: dict) -> Dict[str, any]:
             'emoji': '🌟'
         }
     
-    # Calculate violation metrics
-    total_violations = len(violations)
-    active_violations = len([v for v in violations if v.get('VIOLATION_STATUS') == 'Unaddressed'])
-    health_violations = len([v for v in violations if v.get('IS_HEALTH_BASED_IND') == 'Y'])
-    active_health = len([v for v in violations if v.get('VIOLATION_STATUS') == 'Unaddressed' and v.get('IS_HEALTH_BASED_IND') == 'Y'])
+    # Streamlit reruns grade the same system repeatedly, so cache on a digest of
+    # just the three fields the grade reads (the full records are far costlier to hash)
+    pwsid = system_data.get('system', {}).get('PWSID', '')
+    fingerprint = tuple(
+        (v.get('VIOLATION_STATUS'), v.get('IS_HEALTH_BASED_IND'), v.get('NON_COMPL_PER_BEGIN_DATE'))
+        for v in violations
+    )
+    digest = hashlib.blake2b(repr(fingerprint).encode(), digest_size=16).hexdigest()
+    
+    return _grade_from_key(pwsid, digest, fingerprint)
+
+@st.cache_data(ttl=3600)
+def _grade_from_key(pwsid: str, fingerprint_digest: str, _fingerprint: tuple) -> Dict[str, any]:
+    """Grade non-empty (status, health flag, begin date) rows (cached on pwsid + digest)"""
+    # Calculate violation metrics in one vectorized pass
+    df = pd.DataFrame(
+        list(_fingerprint),
+        columns=['VIOLATION_STATUS', 'IS_HEALTH_BASED_IND', 'NON_COMPL_PER_BEGIN_DATE']
+    )
+    active_mask = df['VIOLATION_STATUS'].eq('Unaddressed')
+    health_mask = df['IS_HEALTH_BASED_IND'].eq('Y')
+    
+    total_violations = len(df)
+    active_violations = int(active_mask.sum())
+    health_violations = int(health_mask.sum())
+    active_health = int((active_mask & health_mask).sum())
     
     # Calculate resolution rate
     resolved = total_violations - active_violations
     resolution_rate = (resolved / total_violations * 100) if total_violations > 0 else 100
     
-    # Recent violations (last 2 years)
-    recent_violations = 0
-    two_years_ago = datetime.now() - timedelta(days=730)
-    
-    for v in violations:
-        try:
-            viol_date = pd.to_datetime(v.get('NON_COMPL_PER_BEGIN_DATE'))
-            if viol_date and viol_date > two_years_ago:
-                recent_violations += 1
-        except:
-            pass
-    
-    # Grading logic
-    if active_health > 0:
-        # Active health violations = automatic D or F
-        if active_health >= 3:
-            grade = 'F'
-            score = 30
-            color = 'danger'
-            status = 'Critical'
-            explanation = f'{active_health} active health-based violations'
-            emoji = '🚨'
-        else:
-            grade = 'D'
-            score = 50
-            color = 'warning'
-            status = 'Poor'
-            explanation = f'{active_health} active health violation(s)'
-            emoji = '⚠️'
-    
-    elif active_violations > 0:
-        # Active non-health violations
-        if active_violations >= 5:
-            grade = 'D'
-            score = 55
-            color = 'warning'
-            status = 'Poor'
-            explanation = f'{active_violations} active violations'
-            emoji = '⚠️'
-        else:
-            grade = 'C'
-            score = 70
-            color = 'info'
-            status = 'Fair'
-            explanation = f'{active_violations} active violation(s)'
-            emoji = '📋'
-    
-    elif recent_violations > 0:
-        # Recent but resolved violations
-        if resolution_rate >= 90:
-            grade = 'B'
-            score = 85
-            color = 'primary'
-            status = 'Good'
-            explanation = f'{recent_violations} recent violations, {resolution_rate:.0f}% resolved'
-            emoji = '✅'
-        else:
-            grade = 'C'
-            score = 75
-            color = 'info'
-            status = 'Fair'
-            explanation = f'{recent_violations} recent violations, {resolution_rate:.0f}% resolved'
-            emoji = '📋'
-    
+    # Recent violations (last 2 years); unparseable dates never count
+    two_years_ago = _two_years_ago(int(time.time() // 3600))
+    if active_violations == 0 and health_violations == 0 and total_violations <= 3:
+        # Small clean records are the common case; skip the pd.to_datetime setup cost
+        recent_violations = sum(
+            1 for value in df['NON_COMPL_PER_BEGIN_DATE']
+            if (viol_date := _parse_violation_date(value)) and viol_date > two_years_ago
+        )
     else:
-        # Old violations only
-        if total_violations <= 3:
-            grade = 'A'
-            score = 95
-            color = 'success'
-            status = 'Excellent'
-            explanation = 'Only minor historical violations'
-            emoji = '🌟'
-        else:
-            grade = 'B'
-            score = 80
-            color = 'primary'
-            status = 'Good'
-            explanation = f'{total_violations} historical violations, all resolved'
-            emoji = '✅'
+        dates = pd.to_datetime(df['NON_COMPL_PER_BEGIN_DATE'], format='%m/%d/%Y', errors='coerce')
+        recent_violations = int((dates > two_years_ago).sum())
+    
+    metrics = {
+        'total_violations': total_violations,
+        'active_violations': active_violations,
+        'health_violations': health_violations,
+        'active_health': active_health,
+        'resolution_rate': resolution_rate,
+        'recent_violations': recent_violations
+    }
+    
+    # First matching rule wins
+    for condition, rule in _GRADE_RULES:
+        if condition(metrics):
+            break
     
     return {
-        'grade': grade,
-        'score': score,
-        'color': color,
-        'status': status,
-        'explanation': explanation,
-        'emoji': emoji,
-        'metrics': {
-            'total_violations': total_violations,
-            'active_violations': active_violations,
-            'health_violations': health_violations,
-            'active_health': active_health,
-            'resolution_rate': resolution_rate,
-            'recent_violations': recent_violations
-        }
+        **rule,
+        'explanation': rule['explanation'].format(**metrics),
+        'metrics': metrics
     }
 
 def get_grade_color_class(grade: str) -> str:
     """Get CSS color class for grade"""
-    color_map = {
-        'A': 'excellent',  # Green
-        'B': 'good',       # Blue
-        'C': 'fair',       # Yellow
-        'D': 'poor',       # Orange
-        'F': 'critical'    # Red
-    }
-    return color_map.get(grade, 'fair')
+    return _GRADE_COLOR_CLASSES.get(grade, 'fair')
 
 def get_improvement_tips(grade_data: dict) -> List[str]:
     """Get improvement tips based on grade"""
-    tips = []
     metrics = grade_data.get('metrics', {})
+    return list(_improvement_tips(tuple(sorted(metrics.items()))))
+
+@lru_cache(maxsize=32)
+def _improvement_tips(metrics_items: Tuple[Tuple[str, float], ...]) -> Tuple[str, ...]:
+    """Compute tips for a frozen view of the grade metrics"""
+    tips = []
+    metrics = dict(metrics_items)
     
     if metrics.get('active_health', 0) > 0:
         tips.append("🚨 Address health-based violations immediately")
@@ -175,4 +195,4 @@ def get_improvement_tips(grade_data: dict) -> List[str]:
     if not tips:
         tips.append("🌟 Keep up the excellent work!")
     
-    return tips
\ No newline at end of file
+    return tuple(tips)
@@ -3,9 +3,101 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from typing import Optional, Dict, Any
+import streamlit as st
+from functools import lru_cache
+from typing import Optional, Dict, Any, Tuple
 import folium
 
+def _hash_frame(df: pd.DataFrame) -> bytes:
+    """Full-content hash for chart cache keys (Streamlit samples very large frames)"""
+    return pd.util.hash_pandas_object(df, index=True).values.tobytes()
+
+# Chart builders are deterministic in their inputs, so reruns reuse the built figure.
+# cache_resource hands back the stored object itself (cache_data would pickle it, and
+# unpickling a Figure rebuilds and revalidates it), so callers must not mutate the result.
+_cache_chart = st.cache_resource(ttl=3600, max_entries=64, show_spinner=False,
+                                 hash_funcs={pd.DataFrame: _hash_frame})
+
+# Chart colors for each violation status
+STATUS_COLOR_MAP = {
+    'Resolved': '#28a745',
+    'Addressed': '#ffc107',
+    'Unaddressed': '#dc3545',
+    'Archived': '#6c757d'
+}
+
+def _parse_dates_cached(series: pd.Series, fmt: str = '%m/%d/%Y') -> pd.Series:
+    """
+    Parse each unique date string once and map the results back onto the series.
+    Columns that are already datetime64 are returned as-is; placeholders such as
+    '--->' fail the format and become NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    
+    uniques = series.dropna().unique()
+    if len(uniques) == 0:
+        # All-null column; mapping through an empty lookup is version-dependent in pandas
+        return pd.Series(pd.NaT, index=series.index, dtype='datetime64[ns]')
+    lookup = pd.Series(pd.to_datetime(uniques, format=fmt, errors='coerce'), index=uniques)
+    return series.map(lookup)
+
+# Marker cap per lead/copper series; larger series with (nearly) one sample per date
+# are downsampled with LTTB
+LCR_MAX_POINTS = 2000
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Indices kept by Largest-Triangle-Three-Buckets downsampling (x must be sorted)"""
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    
+    # First and last points are always kept; the rest split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Keep the point forming the largest triangle with the previous pick and next bucket's mean
+        areas = np.abs(
+            (x[prev] - avg_x) * (y[start:end] - y[prev])
+            - (x[prev] - x[start:end]) * (avg_y - y[prev])
+        )
+        prev = start + int(areas.argmax())
+        keep[i + 1] = prev
+    
+    return keep
+
+def _downsample_series(x: pd.Series, y: pd.Series, n_out: int = LCR_MAX_POINTS):
+    """
+    Sort a date/value series by date and cap it at n_out points with LTTB.
+    LTTB assumes one value per date; when dates repeat (many systems sampled on
+    the same day) it keeps the extremes of each bucket and overstates outliers,
+    so such series are returned whole for Scattergl to draw.
+    """
+    if len(x) <= n_out or x.nunique() <= n_out:
+        return x, y
+    
+    order = np.argsort(x.to_numpy(), kind='stable')
+    x_sorted = x.iloc[order]
+    y_sorted = y.iloc[order]
+    idx = _lttb_indices(
+        x_sorted.to_numpy().astype('int64').astype(float),
+        pd.to_numeric(y_sorted, errors='coerce').fillna(0).to_numpy(dtype=float),
+        n_out
+    )
+    return x_sorted.iloc[idx], y_sorted.iloc[idx]
+
+@_cache_chart
 def create_violation_timeline(violations_df: pd.DataFrame) -> go.Figure:
     """Create timeline chart of violations"""
     if violations_df.empty:
@@ -15,42 +107,30 @@ def create_violation_timeline(violations_df: pd.DataFrame) -> go.Figure:
             font=dict(size=20)
         )
     
-    # Prepare data with error handling for invalid dates
-    # Handle different date formats and invalid values
-    violations_df['BEGIN_DATE'] = pd.to_datetime(
-        violations_df['NON_COMPL_PER_BEGIN_DATE'], 
-        format='%m/%d/%Y', 
-        errors='coerce'
-    )
-    violations_df['END_DATE'] = pd.to_datetime(
-        violations_df['NON_COMPL_PER_END_DATE'].replace('--->', pd.NaT), 
-        format='%m/%d/%Y', 
-        errors='coerce'
-    )
+    # Parse dates into a local series so the caller's DataFrame is left untouched
+    begin_date = _parse_dates_cached(violations_df['NON_COMPL_PER_BEGIN_DATE'])
     
     # Remove rows with invalid begin dates
-    violations_df = violations_df.dropna(subset=['BEGIN_DATE'])
-    
-    # Color by status
-    color_map = {
-        'Resolved': '#28a745',
-        'Addressed': '#ffc107',
-        'Unaddressed': '#dc3545',
-        'Archived': '#6c757d'
-    }
-    
-    fig = go.Figure()
+    valid = begin_date.notna()
+    violations_df = violations_df[valid]
+    begin_date = begin_date[valid]
+    
+    # Categorical codes let the status/type groupbys compare small ints; this frame
+    # is already a filtered copy, so the parsed dates can ride along as a column
+    violations_df = violations_df.assign(
+        VIOLATION_STATUS=pd.Categorical(violations_df['VIOLATION_STATUS'], categories=list(STATUS_COLOR_MAP)),
+        VIOLATION_DESC=violations_df['VIOLATION_DESC'].astype('category'),
+        BEGIN_DATE=begin_date
+    )
     
-    # Group violations by type and status to show counts
-    violation_counts = violations_df.groupby(['VIOLATION_DESC', 'VIOLATION_STATUS']).size().reset_index(name='count')
+    # Split by status in one pass instead of one boolean scan per status
+    by_status = dict(iter(violations_df.groupby('VIOLATION_STATUS', observed=True)))
     
-    for status, color in color_map.items():
-        df_status = violations_df[violations_df['VIOLATION_STATUS'] == status]
-        if not df_status.empty:
-            # Get count for each violation type
-            counts_by_type = df_status.groupby('VIOLATION_DESC').size()
-            
-            fig.add_trace(go.Scatter(
+    traces = []
+    for status, color in STATUS_COLOR_MAP.items():
+        df_status = by_status.get(status)
+        if df_status is not None and not df_status.empty:
+            traces.append(go.Scattergl(
                 x=df_status['BEGIN_DATE'],
                 y=df_status['VIOLATION_DESC'],
                 mode='markers',
@@ -59,19 +139,24 @@ def create_violation_timeline(violations_df: pd.DataFrame) -> go.Figure:
                 hoverinfo='skip'  # Disable hover
             ))
     
-    # Add text annotations for violation counts
-    for violation_type in violations_df['VIOLATION_DESC'].unique():
-        count = len(violations_df[violations_df['VIOLATION_DESC'] == violation_type])
-        fig.add_annotation(
-            x=violations_df[violations_df['VIOLATION_DESC'] == violation_type]['BEGIN_DATE'].max(),
+    # Text annotations for violation counts
+    type_stats = violations_df.groupby('VIOLATION_DESC', observed=True)['BEGIN_DATE'].agg(['size', 'max'])
+    annotations = [
+        dict(
+            x=latest,
             y=violation_type,
             text=f" ({count})",
             showarrow=False,
             xanchor='left',
             font=dict(size=10, color='black')
         )
+        for violation_type, count, latest in zip(type_stats.index, type_stats['size'], type_stats['max'])
+    ]
     
+    # Build the figure in one go rather than validating trace by trace
+    fig = go.Figure(data=traces)
     fig.update_layout(
+        annotations=annotations,
         title="Violation Timeline",
         xaxis_title="Date",
         yaxis_title="Violation Type",
@@ -82,6 +167,7 @@ def create_violation_timeline(violations_df: pd.DataFrame) -> go.Figure:
     
     return fig
 
+@_cache_chart
 def create_violation_summary_pie(violations_df: pd.DataFrame) -> go.Figure:
     """Create pie chart of violation status"""
     if violations_df.empty:
@@ -89,18 +175,11 @@ def create_violation_summary_pie(violations_df: pd.DataFrame) -> go.Figure:
     
     status_counts = violations_df['VIOLATION_STATUS'].value_counts()
     
-    colors = {
-        'Resolved': '#28a745',
-        'Addressed': '#ffc107',
-        'Unaddressed': '#dc3545',
-        'Archived': '#6c757d'
-    }
-    
     fig = go.Figure(data=[go.Pie(
         labels=status_counts.index,
         values=status_counts.values,
         hole=0.3,
-        marker=dict(colors=[colors.get(s, '#999') for s in status_counts.index])
+        marker=dict(colors=status_counts.index.map(STATUS_COLOR_MAP).fillna('#999').tolist())
     )])
     
     fig.update_layout(
@@ -110,58 +189,61 @@ def create_violation_summary_pie(violations_df: pd.DataFrame) -> go.Figure:
     
     return fig
 
+@_cache_chart
 def create_population_impact_bar(top_violators_df: pd.DataFrame) -> go.Figure:
     """Create bar chart showing population impacted by violations"""
     if top_violators_df.empty:
         return go.Figure()
     
-    # Sort by violation count to show worst offenders
-    df = top_violators_df.sort_values('violation_count', ascending=True).tail(15)
-    
-    # Create labels with just the water system name
-    df['label'] = df['PWS_NAME']
-    
-    # Calculate non-health violations
-    df['non_health_violations'] = df['violation_count'] - df['health_violations']
-    
-    fig = go.Figure()
-    
-    # Add bars for non-health violations (base)
-    fig.add_trace(go.Bar(
-        name='Other Violations',
-        y=df['label'],
-        x=df['non_health_violations'],
-        orientation='h',
-        marker_color='lightblue',
-        text=df['non_health_violations'].apply(lambda x: str(x) if x > 0 else ''),
-        textposition='inside',
-        hovertemplate='%{x} non-health violations<extra></extra>'
-    ))
-    
-    # Add bars for health violations (stacked on top)
-    fig.add_trace(go.Bar(
-        name='Health-Based Violations',
-        y=df['label'],
-        x=df['health_violations'],
-        orientation='h',
-        marker_color='#dc3545',
-        text=df['health_violations'].apply(lambda x: str(x) if x > 0 else ''),
-        textposition='inside',
-        hovertemplate='%{x} health violations<extra></extra>'
-    ))
-    
-    # Add total count annotations at the end of each bar
-    for idx, row in df.iterrows():
-        fig.add_annotation(
-            x=row['violation_count'] + 2,
-            y=row['label'],
-            text=f"Total: {row['violation_count']}",
+    # Keep the 15 worst offenders, ascending so the largest bar is drawn on top
+    df = top_violators_df.nlargest(15, 'violation_count').sort_values('violation_count')
+    
+    # Calculate non-health violations and bar labels (blank for empty segments)
+    health_violations = df['health_violations'].to_numpy()
+    non_health_violations = df['violation_count'].to_numpy() - health_violations
+    health_text = np.where(health_violations > 0, health_violations.astype(str), '')
+    non_health_text = np.where(non_health_violations > 0, non_health_violations.astype(str), '')
+    
+    fig = go.Figure(data=[
+        # Bars for non-health violations (base)
+        go.Bar(
+            name='Other Violations',
+            y=df['PWS_NAME'],
+            x=non_health_violations,
+            orientation='h',
+            marker_color='lightblue',
+            text=non_health_text,
+            textposition='inside',
+            hovertemplate='%{x} non-health violations<extra></extra>'
+        ),
+        # Bars for health violations (stacked on top)
+        go.Bar(
+            name='Health-Based Violations',
+            y=df['PWS_NAME'],
+            x=health_violations,
+            orientation='h',
+            marker_color='#dc3545',
+            text=health_text,
+            textposition='inside',
+            hovertemplate='%{x} health violations<extra></extra>'
+        )
+    ])
+    
+    # Total count annotations at the end of each bar, applied in one layout update
+    annotations = [
+        dict(
+            x=row.violation_count + 2,
+            y=row.PWS_NAME,
+            text=f"Total: {row.violation_count}",
             showarrow=False,
             font=dict(size=10, color='black'),
             xanchor='left'
         )
+        for row in df.itertuples(index=False)
+    ]
     
     fig.update_layout(
+        annotations=annotations,
         title="Water Systems with Most Violations",
         xaxis_title="Number of Violations",
         yaxis_title="",
@@ -174,20 +256,21 @@ def create_population_impact_bar(top_violators_df: pd.DataFrame) -> go.Figure:
     
     return fig
 
+@_cache_chart
 def create_lead_copper_scatter(lcr_df: pd.DataFrame) -> go.Figure:
     """Create scatter plot of lead and copper levels over time"""
     if lcr_df.empty:
         return go.Figure()
     
-    # Convert dates with error handling
-    lcr_df['SAMPLING_DATE'] = pd.to_datetime(
-        lcr_df['SAMPLING_END_DATE'].replace('--->', pd.NaT), 
-        format='%m/%d/%Y', 
-        errors='coerce'
-    )
+    # Convert dates into a local series so the caller's DataFrame is left untouched
+    sampling_date = _parse_dates_cached(lcr_df['SAMPLING_END_DATE'])
     
-    # Remove rows with invalid dates
-    lcr_df = lcr_df.dropna(subset=['SAMPLING_DATE'])
+    # Keep lead/copper rows with valid dates and split them by contaminant in one pass
+    keep = sampling_date.notna() & lcr_df['CONTAMINANT_CODE'].isin(('PB90', 'CU90'))
+    samples = lcr_df[keep].assign(SAMPLING_DATE=sampling_date[keep])
+    groups = dict(iter(samples.groupby('CONTAMINANT_CODE', observed=True)))
+    lead_df = groups.get('PB90')
+    copper_df = groups.get('CU90')
     
     # EPA action levels
     lead_action = 15  # ppb
@@ -201,39 +284,43 @@ def create_lead_copper_scatter(lcr_df: pd.DataFrame) -> go.Figure:
         vertical_spacing=0.1
     )
     
+    # Collect both series and add them to the subplots in one call
+    traces, rows = [], []
+    
     # Lead data
-    lead_df = lcr_df[lcr_df['CONTAMINANT_CODE'] == 'PB90']
-    if not lead_df.empty:
-        fig.add_trace(
-            go.Scatter(
-                x=lead_df['SAMPLING_DATE'],
-                y=lead_df['SAMPLE_MEASURE'],
-                mode='markers',
-                name='Lead Samples',
-                marker=dict(color='blue', size=8),
-                hovertemplate='%{y} ppb<extra></extra>'
-            ),
-            row=1, col=1
-        )
-        # Add action level line
-        fig.add_hline(y=lead_action, line_dash="dash", line_color="red",
-                      annotation_text="EPA Action Level (15 ppb)", row=1, col=1)
+    if lead_df is not None:
+        lead_x, lead_y = _downsample_series(lead_df['SAMPLING_DATE'], lead_df['SAMPLE_MEASURE'])
+        traces.append(go.Scattergl(
+            x=lead_x,
+            y=lead_y,
+            mode='markers',
+            name='Lead Samples',
+            marker=dict(color='blue', size=8),
+            hovertemplate='%{y} ppb<extra></extra>'
+        ))
+        rows.append(1)
     
     # Copper data
-    copper_df = lcr_df[lcr_df['CONTAMINANT_CODE'] == 'CU90']
-    if not copper_df.empty:
-        fig.add_trace(
-            go.Scatter(
-                x=copper_df['SAMPLING_DATE'],
-                y=copper_df['SAMPLE_MEASURE'],
-                mode='markers',
-                name='Copper Samples',
-                marker=dict(color='orange', size=8),
-                hovertemplate='%{y} ppb<extra></extra>'
-            ),
-            row=2, col=1
-        )
-        # Add action level line
+    if copper_df is not None:
+        copper_x, copper_y = _downsample_series(copper_df['SAMPLING_DATE'], copper_df['SAMPLE_MEASURE'])
+        traces.append(go.Scattergl(
+            x=copper_x,
+            y=copper_y,
+            mode='markers',
+            name='Copper Samples',
+            marker=dict(color='orange', size=8),
+            hovertemplate='%{y} ppb<extra></extra>'
+        ))
+        rows.append(2)
+    
+    if traces:
+        fig.add_traces(traces, rows=rows, cols=[1] * len(rows))
+    
+    # Add action level lines
+    if lead_df is not None:
+        fig.add_hline(y=lead_action, line_dash="dash", line_color="red",
+                      annotation_text="EPA Action Level (15 ppb)", row=1, col=1)
+    if copper_df is not None:
         fig.add_hline(y=copper_action, line_dash="dash", line_color="red",
                       annotation_text="EPA Action Level (1300 ppb)", row=2, col=1)
     
@@ -249,18 +336,21 @@ def create_lead_copper_scatter(lcr_df: pd.DataFrame) -> go.Figure:
     
     return fig
 
+@_cache_chart
 def create_geographic_heatmap(geo_summary_df: pd.DataFrame, use_log_scale: bool = False) -> go.Figure:
     """Create choropleth map of violations by city"""
     if geo_summary_df.empty:
         return go.Figure()
     
-    # Calculate additional metrics
-    df = geo_summary_df.head(50).copy()  # Top 50 cities
-    df['violations_per_system'] = (df['violation_count'] / df['system_count']).round(1)
-    df['violations_per_1k_pop'] = ((df['violation_count'] / df['total_population']) * 1000).round(2)
+    df = geo_summary_df.nlargest(50, 'violation_count')  # Top 50 cities
     
-    # Handle NaN values
-    df['violations_per_system'] = df['violations_per_system'].fillna(0)
+    # Calculate additional metrics straight into the hover customdata (0 where undefined)
+    violations = df['violation_count'].to_numpy(dtype=float)
+    systems = df['system_count'].to_numpy(dtype=float)
+    population = df['total_population'].to_numpy(dtype=float)
+    per_system = np.round(np.divide(violations, systems, out=np.zeros_like(violations), where=systems != 0), 1)
+    per_1k_pop = np.round(np.divide(violations, population, out=np.zeros_like(violations), where=population != 0) * 1000, 2)
+    customdata = np.column_stack([systems, population, per_system, per_1k_pop])
     
     # Use violation count directly for color - simpler and more intuitive
     # The size already represents count, so color can too
@@ -272,7 +362,7 @@ def create_geographic_heatmap(geo_summary_df: pd.DataFrame, use_log_scale: bool
         labels=df['CITY_NAME'],
         parents=['Georgia'] * len(df),
         values=df['violation_count'],
-        text=[f"<b>{city}</b><br>{count} violations" for city, count in zip(df['CITY_NAME'], df['violation_count'])],
+        text=('<b>' + df['CITY_NAME'].astype(str) + '</b><br>' + df['violation_count'].astype(str) + ' violations').tolist(),
         textinfo="text",
         marker=dict(
             colorscale=[
@@ -298,7 +388,7 @@ def create_geographic_heatmap(geo_summary_df: pd.DataFrame, use_log_scale: bool
             ),
             colors=df['violation_count']
         ),
-        customdata=df[['system_count', 'total_population', 'violations_per_system', 'violations_per_1k_pop']].values,
+        customdata=customdata,
         hovertemplate='<b>%{label}</b><br>' +
                       'Total Violations: %{value}<br>' +
                       'Water Systems: %{customdata[0]}<br>' +
@@ -316,32 +406,32 @@ def create_geographic_heatmap(geo_summary_df: pd.DataFrame, use_log_scale: bool
     
     return fig
 
+# Scorecard rules, shared by the single-system and batch scorers
+SCORE_ACTIVE_PENALTY = 10  # per active (unaddressed) violation
+SCORE_HEALTH_PENALTY = 5   # additional, per health-based violation
+# (minimum score, status, color), best band first; anything lower gets SCORE_FLOOR_BAND
+SCORE_BANDS = ((90, 'Good', 'green'), (70, 'Fair', 'yellow'))
+SCORE_FLOOR_BAND = ('Poor', 'red')
+
+def _score(active_violations, health_violations):
+    """Score from violation counts (100 = perfect, 0 = worst); works on ints or Series"""
+    return np.clip(
+        100 - active_violations * SCORE_ACTIVE_PENALTY - health_violations * SCORE_HEALTH_PENALTY,
+        0, 100
+    )
+
 def create_system_scorecard(system_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create metrics for a water system scorecard"""
     system = system_data.get('system', {})
     violations = system_data.get('violations', [])
     
-    # Calculate metrics
-    total_violations = len(violations)
-    active_violations = sum(1 for v in violations if v.get('VIOLATION_STATUS') == 'Unaddressed')
-    health_violations = sum(1 for v in violations if v.get('IS_HEALTH_BASED_IND') == 'Y')
-    
-    # Calculate score (100 = perfect, 0 = worst)
-    score = 100
-    score -= active_violations * 10  # -10 for each active violation
-    score -= health_violations * 5   # Additional -5 for health violations
-    score = max(0, min(100, score))  # Keep between 0-100
-    
-    # Determine status
-    if score >= 90:
-        status = "Good"
-        color = "green"
-    elif score >= 70:
-        status = "Fair"
-        color = "yellow"
-    else:
-        status = "Poor"
-        color = "red"
+    # Only status and health flag affect the score, so they form the cache key
+    fingerprint = tuple(
+        (v.get('VIOLATION_STATUS'), v.get('IS_HEALTH_BASED_IND')) for v in violations
+    )
+    score, status, color, total_violations, active_violations, health_violations = _scorecard(
+        system.get('PWSID', ''), fingerprint
+    )
     
     return {
         'score': score,
@@ -355,4 +445,52 @@ def create_system_scorecard(system_data: Dict[str, Any]) -> Dict[str, Any]:
             'System Type': system.get('PWS_TYPE_CODE', 'Unknown'),
             'Owner Type': system.get('OWNER_TYPE_CODE', 'Unknown')
         }
-    }
\ No newline at end of file
+    }
+
+@lru_cache(maxsize=4096)
+def _scorecard(pwsid: str, fingerprint: Tuple[Tuple[Optional[str], Optional[str]], ...]) -> tuple:
+    """Score a system from its (status, health flag) pairs; cached across reruns"""
+    # Calculate metrics in a single pass
+    total_violations = active_violations = health_violations = 0
+    for status, health in fingerprint:
+        total_violations += 1
+        if status == 'Unaddressed':
+            active_violations += 1
+        if health == 'Y':
+            health_violations += 1
+    
+    # Calculate score (100 = perfect, 0 = worst)
+    score = int(_score(active_violations, health_violations))
+    
+    # Determine status
+    status, color = SCORE_FLOOR_BAND
+    for minimum, band_status, band_color in SCORE_BANDS:
+        if score >= minimum:
+            status, color = band_status, band_color
+            break
+    
+    return score, status, color, total_violations, active_violations, health_violations
+
+def score_systems_batch(violations_df: pd.DataFrame) -> pd.DataFrame:
+    """Scorecard score, status and color for every PWSID in a violations frame"""
+    if violations_df.empty:
+        return pd.DataFrame(columns=['total_violations', 'active_violations', 'health_violations',
+                                     'score', 'status', 'color'])
+    
+    # Same rules as create_system_scorecard, computed with one groupby over all systems
+    flags = pd.DataFrame({
+        'PWSID': violations_df['PWSID'],
+        'active_violations': violations_df['VIOLATION_STATUS'].eq('Unaddressed'),
+        'health_violations': violations_df['IS_HEALTH_BASED_IND'].eq('Y')
+    })
+    grouped = flags.groupby('PWSID')
+    result = grouped[['active_violations', 'health_violations']].sum().astype(int)
+    result.insert(0, 'total_violations', grouped.size())
+    
+    score = _score(result['active_violations'], result['health_violations'])
+    in_band = [score >= minimum for minimum, _, _ in SCORE_BANDS]
+    result['score'] = score
+    result['status'] = np.select(in_band, [status for _, status, _ in SCORE_BANDS], SCORE_FLOOR_BAND[0])
+    result['color'] = np.select(in_band, [color for _, _, color in SCORE_BANDS], SCORE_FLOOR_BAND[1])
+    
+    return result
@@ -6,252 +6,108 @@ Bridges the frontend JavaScript with the backend WebSocket
 import streamlit as st
 import streamlit.components.v1 as components
 import json
-import base64
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+import hashlib
+import os
+import queue
 import threading
 import time
+from collections import deque
+from functools import lru_cache
 from .realtime_voice import RealtimeVoiceAssistant
+from ._compat import b64encode_as_string
+
+# Canonical (sorted-key) JSON as bytes, via orjson when it is installed
+try:
+    import orjson
+    
+    def _json_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS)
+except ImportError:
+    def _json_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True, default=str).encode()
+
+_STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static')
+_HTML_PATH = os.path.join(_STATIC_DIR, 'voice_interface.html')
+_JS_PATH = os.path.join(_STATIC_DIR, 'voice_interface.js')
+
+# Pending audio chunks kept between reruns; the oldest are dropped past this bound
+AUDIO_BUFFER_MAX_CHUNKS = 32
+
+# Audio events queued by the WebSocket thread between reruns; the oldest are dropped
+# when full. Transcript events are never dropped, so their queue is unbounded.
+AUDIO_QUEUE_MAX = 256
+
+# Audio deltas are coalesced until this many bytes, so each played chunk is one larger blob
+AUDIO_FLUSH_BYTES = 16384
+
+
+def _put_dropping_oldest(q: queue.Queue, item):
+    """Enqueue without blocking, discarding the oldest item when the queue is full"""
+    while True:
+        try:
+            q.put_nowait(item)
+            return
+        except queue.Full:
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+
+
+def _format_transcript_entry(entry: Dict[str, Any]) -> str:
+    """Markdown line for one transcript entry ('' for roles that are not shown)"""
+    if entry['role'] == 'user':
+        return f"**🗣️ You:** {entry['content']}"
+    elif entry['role'] == 'assistant_partial':
+        return f"**🤖 Assistant:** {''.join(entry['content'])}"
+    elif entry['role'] == 'assistant':
+        return f"**🤖 Assistant:** {entry['content']}"
+    return ''
+
+
+@lru_cache(maxsize=1)
+def _build_html() -> str:
+    """Read the frontend page and script and assemble the component HTML once per process"""
+    with open(_HTML_PATH, 'r') as f:
+        html_template = f.read()
+    with open(_JS_PATH, 'r') as f:
+        js_code = f.read()
+    
+    # Plain placeholder substitution; the page's CSS/JS braces need no escaping
+    return html_template.replace('{JS_CODE}', js_code)
+
 
 class VoiceComponent:
     """Streamlit component for voice interaction"""
     
     def __init__(self):
+        # Shared across sessions: built once by the cached singleton
+        self.html = _build_html()
+    
+    def ensure_session(self):
+        """Set up this browser session's assistant, transcript and audio queues"""
         if 'voice_assistant' not in st.session_state:
             st.session_state.voice_assistant = RealtimeVoiceAssistant()
             st.session_state.voice_connected = False
             st.session_state.voice_transcript = []
-            st.session_state.audio_buffer = []
-        
-        self.assistant = st.session_state.voice_assistant
+            st.session_state.audio_buffer = deque(maxlen=AUDIO_BUFFER_MAX_CHUNKS)
+            st.session_state.audio_pending = []
+            st.session_state.audio_pending_size = 0
+            st.session_state.audio_q = queue.Queue(maxsize=AUDIO_QUEUE_MAX)
+            st.session_state.transcript_q = queue.Queue()
+    
+    @property
+    def assistant(self) -> RealtimeVoiceAssistant:
+        """The current session's realtime assistant (never shared between users)"""
+        return st.session_state.voice_assistant
         
     def render(self):
         """Render the voice interface component"""
         
-        # Load JavaScript
-        import os
-        js_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static', 'voice_interface.js')
-        with open(js_path, 'r') as f:
-            js_code = f.read()
-        
-        # HTML template with embedded JavaScript
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{
-                    font-family: sans-serif;
-                    padding: 20px;
-                    background: #f0f2f6;
-                    margin: 0;
-                }}
-                .voice-container {{
-                    max-width: 600px;
-                    margin: 0 auto;
-                }}
-                .controls {{
-                    display: flex;
-                    gap: 10px;
-                    margin-bottom: 20px;
-                }}
-                button {{
-                    padding: 10px 20px;
-                    border: none;
-                    border-radius: 5px;
-                    cursor: pointer;
-                    font-size: 16px;
-                    transition: all 0.3s;
-                }}
-                .btn-primary {{
-                    background: #ff6b6b;
-                    color: white;
-                }}
-                .btn-primary:hover {{
-                    background: #ff5252;
-                }}
-                .btn-secondary {{
-                    background: #4CAF50;
-                    color: white;
-                }}
-                .btn-secondary:hover {{
-                    background: #45a049;
-                }}
-                button:disabled {{
-                    opacity: 0.5;
-                    cursor: not-allowed;
-                }}
-                .status {{
-                    padding: 10px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                    text-align: center;
-                }}
-                .status.recording {{
-                    background: #ffebee;
-                    color: #c62828;
-                    animation: pulse 1.5s infinite;
-                }}
-                .status.ready {{
-                    background: #e8f5e9;
-                    color: #2e7d32;
-                }}
-                .status.processing {{
-                    background: #fff3e0;
-                    color: #e65100;
-                }}
-                @keyframes pulse {{
-                    0% {{ opacity: 1; }}
-                    50% {{ opacity: 0.7; }}
-                    100% {{ opacity: 1; }}
-                }}
-                .audio-visualizer {{
-                    height: 60px;
-                    background: #333;
-                    border-radius: 5px;
-                    margin: 20px 0;
-                    display: flex;
-                    align-items: center;
-                    justify-content: center;
-                    gap: 3px;
-                    padding: 0 20px;
-                }}
-                .audio-bar {{
-                    width: 4px;
-                    height: 20px;
-                    background: #4CAF50;
-                    border-radius: 2px;
-                    transition: height 0.1s;
-                }}
-                .instructions {{
-                    background: #e3f2fd;
-                    padding: 15px;
-                    border-radius: 5px;
-                    margin-bottom: 20px;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="voice-container">
-                <div class="status ready" id="status">
-                    🎤 Ready to listen
-                </div>
-                
-                <div class="instructions">
-                    <strong>How to use:</strong><br>
-                    1. Click "Start Listening" and allow microphone access<br>
-                    2. Speak your question about water quality<br>
-                    3. The AI will respond with voice<br>
-                    4. Click "Stop Listening" when done
-                </div>
-                
-                <div class="controls">
-                    <button id="initBtn" class="btn-secondary" onclick="initializeVoice()">
-                        🔌 Initialize
-                    </button>
-                    <button id="startBtn" class="btn-primary" onclick="toggleRecording()" disabled>
-                        🎤 Start Listening
-                    </button>
-                </div>
-                
-                <div class="audio-visualizer" id="visualizer">
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                    <div class="audio-bar"></div>
-                </div>
-            </div>
-            
-            <script>
-                {js_code}
-                
-                let isRecording = false;
-                let isInitialized = false;
-                
-                function updateStatus(message, className) {{
-                    const status = document.getElementById('status');
-                    status.textContent = message;
-                    status.className = 'status ' + className;
-                }}
-                
-                async function initializeVoice() {{
-                    const initBtn = document.getElementById('initBtn');
-                    initBtn.disabled = true;
-                    initBtn.textContent = '⏳ Initializing...';
-                    
-                    updateStatus('Initializing microphone...', 'processing');
-                    
-                    // Initialize voice interface
-                    const success = await initVoice();
-                    
-                    if (success) {{
-                        isInitialized = true;
-                        updateStatus('✅ Microphone ready', 'ready');
-                        document.getElementById('startBtn').disabled = false;
-                        initBtn.textContent = '✅ Initialized';
-                    }} else {{
-                        updateStatus('❌ Microphone access denied', 'error');
-                        initBtn.disabled = false;
-                        initBtn.textContent = '🔌 Retry Initialize';
-                    }}
-                }}
-                
-                function toggleRecording() {{
-                    const btn = document.getElementById('startBtn');
-                    
-                    if (!isRecording) {{
-                        startRecording();
-                        isRecording = true;
-                        btn.textContent = '⏹️ Stop Listening';
-                        btn.style.background = '#f44336';
-                        updateStatus('🔴 Listening... Speak now!', 'recording');
-                        animateVisualizer(true);
-                    }} else {{
-                        stopRecording();
-                        isRecording = false;
-                        btn.textContent = '🎤 Start Listening';
-                        btn.style.background = '#ff6b6b';
-                        updateStatus('✅ Ready to listen', 'ready');
-                        animateVisualizer(false);
-                    }}
-                }}
-                
-                function animateVisualizer(active) {{
-                    const bars = document.querySelectorAll('.audio-bar');
-                    
-                    if (active) {{
-                        // Animate bars
-                        setInterval(() => {{
-                            bars.forEach(bar => {{
-                                const height = Math.random() * 40 + 10;
-                                bar.style.height = height + 'px';
-                            }});
-                        }}, 100);
-                    }} else {{
-                        // Reset bars
-                        bars.forEach(bar => {{
-                            bar.style.height = '20px';
-                        }});
-                    }}
-                }}
-                
-                // Listen for Enter key
-                document.addEventListener('keydown', (e) => {{
-                    if (e.key === 'Enter' && isInitialized && !isRecording) {{
-                        toggleRecording();
-                    }}
-                }});
-            </script>
-        </body>
-        </html>
-        """
-        
-        # Render component
+        # Render component; the page never changes between reruns, so it is built once
         component_value = components.html(
-            html_template,
+            self.html,
             height=400,
             scrolling=False
         )
@@ -260,68 +116,135 @@ class VoiceComponent:
     
     def connect_websocket(self):
         """Connect to OpenAI Realtime API"""
+        # The callbacks run on the WebSocket thread, so they only enqueue;
+        # drain_events() applies the results to session state on the script thread
+        audio_q = st.session_state.audio_q
+        transcript_q = st.session_state.transcript_q
         
         def on_audio_response(audio_bytes):
             """Handle audio response from API"""
-            # Convert to base64 for frontend
-            audio_base64 = base64.b64encode(audio_bytes).decode()
-            st.session_state.audio_buffer.append(audio_base64)
+            _put_dropping_oldest(audio_q, audio_bytes)
         
         def on_transcript(role, content):
             """Handle transcript updates"""
-            if role == 'assistant':
-                st.session_state.voice_transcript.append({
-                    'role': 'assistant',
-                    'content': content,
-                    'timestamp': time.time()
-                })
-            elif role == 'assistant_partial':
-                # Update partial transcript
-                if st.session_state.voice_transcript and st.session_state.voice_transcript[-1]['role'] == 'assistant_partial':
-                    st.session_state.voice_transcript[-1]['content'] += content
-                else:
-                    st.session_state.voice_transcript.append({
-                        'role': 'assistant_partial',
-                        'content': content,
-                        'timestamp': time.time()
-                    })
+            transcript_q.put_nowait((role, content))
         
         def on_error(error):
             """Handle errors"""
-            st.error(f"Voice Error: {error}")
+            transcript_q.put_nowait(('error', error))
+        
+        def on_done():
+            """Mark the end of a response so its remaining audio is flushed"""
+            _put_dropping_oldest(audio_q, None)
         
         # Connect with callbacks
         connected = self.assistant.connect(
             on_response=on_audio_response,
             on_transcript=on_transcript,
-            on_error=on_error
+            on_error=on_error,
+            on_done=on_done
         )
         
         st.session_state.voice_connected = connected
+        # A new session starts without context, so the next update must be sent
+        st.session_state.voice_context_hash = None
         return connected
     
-    def process_audio_stream(self, audio_base64: str):
-        """Process incoming audio from frontend"""
+    def _flush_audio(self):
+        """Move the coalesced audio deltas into the playback buffer as one blob"""
+        pending = st.session_state.audio_pending
+        if pending:
+            st.session_state.audio_buffer.append(b"".join(pending))
+            pending.clear()
+            st.session_state.audio_pending_size = 0
+    
+    def drain_events(self):
+        """Apply audio and transcript events queued by the WebSocket thread"""
+        audio_q = st.session_state.audio_q
+        while True:
+            try:
+                audio_bytes = audio_q.get_nowait()
+            except queue.Empty:
+                break
+            if audio_bytes is None:
+                # Response finished
+                self._flush_audio()
+                continue
+            # Keep raw bytes; base64 happens once, when the chunk is played
+            st.session_state.audio_pending.append(audio_bytes)
+            st.session_state.audio_pending_size += len(audio_bytes)
+            if st.session_state.audio_pending_size >= AUDIO_FLUSH_BYTES:
+                self._flush_audio()
+        
+        transcript = st.session_state.voice_transcript
+        transcript_q = st.session_state.transcript_q
+        while True:
+            try:
+                role, content = transcript_q.get_nowait()
+            except queue.Empty:
+                break
+            if role == 'assistant':
+                transcript.append({
+                    'role': 'assistant',
+                    'content': content,
+                    'timestamp': time.time()
+                })
+            elif role == 'assistant_partial':
+                # Collect fragments; they are joined once when the response completes
+                if transcript and transcript[-1]['role'] == 'assistant_partial':
+                    transcript[-1]['content'].append(content)
+                else:
+                    transcript.append({
+                        'role': 'assistant_partial',
+                        'content': [content],
+                        'timestamp': time.time()
+                    })
+            elif role == 'complete':
+                # Finalize the streamed transcript
+                if transcript and transcript[-1]['role'] == 'assistant_partial':
+                    entry = transcript[-1]
+                    entry['content'] = ''.join(entry['content'])
+                    entry['role'] = 'assistant'
+            elif role == 'error':
+                st.error(f"Voice Error: {content}")
+    
+    def process_audio_stream(self, audio: Union[bytes, str]):
+        """Process incoming audio from frontend (raw PCM16 bytes, or base64 text)"""
         if st.session_state.voice_connected:
-            # Decode base64 to bytes
-            audio_bytes = base64.b64decode(audio_base64)
-            
-            # Send to API
-            self.assistant.send_audio(audio_bytes)
+            # Send to API; base64 text is what the API takes, so it is forwarded
+            # without a decode/re-encode round trip
+            if isinstance(audio, str):
+                self.assistant.send_audio_base64(audio)
+            else:
+                self.assistant.send_audio(audio)
     
     def update_context(self, context: Dict[str, Any]):
         """Update voice assistant context"""
         if st.session_state.voice_connected:
+            # Skip the session.update when this context was already sent
+            context_hash = hashlib.blake2b(
+                _json_bytes(context), digest_size=16
+            ).hexdigest()
+            if context_hash == st.session_state.get('voice_context_hash'):
+                return
+            st.session_state.voice_context_hash = context_hash
             self.assistant.update_context(context)
 
 
+@st.cache_resource
+def _get_voice_component() -> VoiceComponent:
+    """Process-wide VoiceComponent; per-session state stays in st.session_state"""
+    return VoiceComponent()
+
+
 def create_realtime_voice_interface(db, ai):
     """Create the main voice interface for Streamlit"""
     
     st.markdown("### 🎙️ Real-time Voice Conversation")
     
     # Initialize component
-    voice_component = VoiceComponent()
+    voice_component = _get_voice_component()
+    voice_component.ensure_session()
     
     # Connection controls
     col1, col2, col3 = st.columns(3)
@@ -345,17 +268,10 @@ def create_realtime_voice_interface(db, ai):
         if st.session_state.get('voice_connected', False):
             if st.checkbox("Add city context"):
                 city = st.text_input("City name:", placeholder="e.g., Atlanta")
-                if city:
-                    # Get city data
-                    city_data = db.query_df("""
-                        SELECT 
-                            COUNT(DISTINCT p.PWSID) as systems,
-                            SUM(p.POPULATION_SERVED_COUNT) as population,
-                            COUNT(DISTINCT v.VIOLATION_ID) as violations
-                        FROM pub_water_systems p
-                        LEFT JOIN violations_enforcement v ON p.PWSID = v.PWSID
-                        WHERE UPPER(p.CITY_NAME) LIKE ?
-                    """, (f"%{city.upper()}%",))
+                # Only look the city up on Apply, not on every edit of the input
+                if st.button("Apply", key="apply_city_context") and city:
+                    # Get city data from the precomputed per-city summary
+                    city_data = db.get_city_summary(city)
                     
                     if not city_data.empty:
                         context = {
@@ -372,31 +288,38 @@ def create_realtime_voice_interface(db, ai):
     
     # Render voice interface
     if st.session_state.get('voice_connected', False):
+        voice_component.drain_events()
         voice_component.render()
         
         # Display transcript
         st.markdown("### 📝 Conversation Transcript")
         
-        transcript_container = st.container()
-        with transcript_container:
-            for entry in st.session_state.get('voice_transcript', []):
-                if entry['role'] == 'user':
-                    st.markdown(f"**🗣️ You:** {entry['content']}")
-                elif entry['role'] in ['assistant', 'assistant_partial']:
-                    st.markdown(f"**🤖 Assistant:** {entry['content']}")
+        # Finished entries are formatted once and kept; only a streaming tail is rebuilt
+        transcript = st.session_state.get('voice_transcript', [])
+        rendered_idx = st.session_state.get('transcript_rendered_idx', 0)
+        rendered = st.session_state.get('transcript_md', [])
+        while rendered_idx < len(transcript) and transcript[rendered_idx]['role'] != 'assistant_partial':
+            line = _format_transcript_entry(transcript[rendered_idx])
+            if line:
+                rendered.append(line)
+            rendered_idx += 1
+        st.session_state.transcript_rendered_idx = rendered_idx
+        st.session_state.transcript_md = rendered
+        
+        streaming = [_format_transcript_entry(entry) for entry in transcript[rendered_idx:]]
+        transcript_placeholder = st.empty()
+        transcript_placeholder.markdown("\n\n".join(rendered + [line for line in streaming if line]))
                 
         # Audio playback handler
-        if st.session_state.get('audio_buffer'):
-            # Play the audio through frontend
-            for audio_base64 in st.session_state.audio_buffer:
-                st.markdown(f"""
-                <script>
-                    playAudio('{audio_base64}');
-                </script>
-                """, unsafe_allow_html=True)
-            
-            # Clear buffer
-            st.session_state.audio_buffer = []
+        audio_buffer = st.session_state.get('audio_buffer')
+        if audio_buffer:
+            # Play every pending chunk through the frontend with one script tag
+            chunks = [b64encode_as_string(audio_buffer.popleft()) for _ in range(len(audio_buffer))]
+            st.markdown(f"""
+            <script>
+                playAudioSequence({_json_bytes(chunks).decode()});
+            </script>
+            """, unsafe_allow_html=True)
     
     else:
         st.info("👆 Click 'Connect to Voice API' to start voice conversation")
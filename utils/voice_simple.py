@@ -4,15 +4,32 @@ Provides text-to-speech for water quality responses
 """
 
 import os
+import hashlib
+import inspect
+import tempfile
+import threading
 from typing import Optional
 from dotenv import load_dotenv
 from openai import OpenAI
 import streamlit as st
-import base64
-from io import BytesIO
+from ._compat import b64encode_as_string
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
 
 load_dotenv()
 
+# st.audio gained autoplay in Streamlit 1.33; older versions need the inline HTML player
+_ST_AUDIO_AUTOPLAY = 'autoplay' in inspect.signature(st.audio).parameters
+
+TTS_MODEL = "tts-1"
+
+# Synthesized audio persisted across restarts and sessions; TTS calls are skipped on a hit
+TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'tts_cache'))
+_tts_cache = diskcache.Cache(TTS_CACHE_DIR, size_limit=500_000_000) if diskcache else None
+
 class SimpleVoiceAssistant:
     """Simple voice assistant using OpenAI TTS"""
     
@@ -24,6 +41,18 @@ class SimpleVoiceAssistant:
             print(f"Error initializing OpenAI client: {e}")
             self.client = None
             self.enabled = False
+            return
+        
+        # Open the pooled connection in the background so the first TTS request
+        # skips DNS/TCP/TLS setup; costs one cheap models.list call per session
+        threading.Thread(target=self._warmup, daemon=True).start()
+    
+    def _warmup(self):
+        """Make a lightweight request so the client's connection pool is hot"""
+        try:
+            self.client.models.list()
+        except Exception as e:
+            print(f"OpenAI client warmup failed: {e}")
     
     def text_to_speech(self, text: str, voice: str = "alloy") -> Optional[bytes]:
         """Convert text to speech using OpenAI TTS"""
@@ -31,28 +60,37 @@ class SimpleVoiceAssistant:
             return None
         
         try:
-            # Generate speech
-            response = self.client.audio.speech.create(
-                model="tts-1",
-                voice=voice,
-                input=text
-            )
-            
-            # Get audio bytes
-            audio_bytes = BytesIO()
-            for chunk in response.iter_bytes():
-                audio_bytes.write(chunk)
-            
-            return audio_bytes.getvalue()
+            return self.synthesize(text, voice)
             
         except Exception as e:
             st.error(f"Error generating speech: {e}")
             return None
     
+    def synthesize(self, text: str, voice: str = "alloy") -> bytes:
+        """Like text_to_speech, but API errors propagate instead of returning None"""
+        key = hashlib.blake2b(f"{voice}|{TTS_MODEL}|{text}".encode(), digest_size=16).digest()
+        if _tts_cache is not None:
+            cached = _tts_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        # Generate speech
+        response = self.client.audio.speech.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text
+        )
+        
+        # The client already buffers the body; use it without re-chunking
+        audio = response.content
+        if _tts_cache is not None:
+            _tts_cache.set(key, audio)
+        return audio
+    
     def create_audio_player(self, audio_bytes: bytes) -> str:
         """Create HTML audio player for the audio bytes"""
         # Encode audio to base64
-        audio_base64 = base64.b64encode(audio_bytes).decode()
+        audio_base64 = b64encode_as_string(audio_bytes)
         
         # Create audio HTML
         audio_html = f"""
@@ -63,6 +101,50 @@ class SimpleVoiceAssistant:
         """
         
         return audio_html
+    
+    def play_audio(self, audio_bytes: bytes):
+        """Autoplay audio, served as a Streamlit media file when supported"""
+        if _ST_AUDIO_AUTOPLAY:
+            st.audio(audio_bytes, format="audio/mp3", autoplay=True)
+        else:
+            st.markdown(self.create_audio_player(audio_bytes), unsafe_allow_html=True)
+
+
+# The cached helpers call the raising API methods: st.cache_data does not store
+# exceptions, so a failed request is retried next time instead of served to everyone
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _cached_chat(question: str, _ai) -> str:
+    """AI answer for a question, shared across sessions (the quick questions repeat often)"""
+    return _ai.ask(question)
+
+
+# Kept small: audio is large, and the disk cache (when installed) holds the long tail
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _cached_tts(text: str, voice: str, _assistant: SimpleVoiceAssistant) -> bytes:
+    """Speech audio for a response, keyed on the text and voice"""
+    return _assistant.synthesize(text, voice)
+
+
+def _chat_answer(question: str, ai) -> str:
+    """Cached AI answer, or the error text (uncached) when the request fails"""
+    if not ai.enabled:
+        return ai.chat_query(question)
+    try:
+        return _cached_chat(question, ai)
+    except Exception as e:
+        return f"Error getting AI response: {str(e)}"
+
+
+def _speech_for(text: str, voice: str, assistant: SimpleVoiceAssistant) -> Optional[bytes]:
+    """Cached speech audio, or None (uncached, with an error shown) when synthesis fails"""
+    if not assistant.enabled:
+        return None
+    try:
+        return _cached_tts(text, voice, assistant)
+    except Exception as e:
+        st.error(f"Error generating speech: {e}")
+        return None
 
 
 def create_simple_voice_interface(db, ai):
@@ -101,11 +183,11 @@ def create_simple_voice_interface(db, ai):
         if question:
             with st.spinner("Getting answer..."):
                 # Get AI response
-                response = ai.chat_query(question)
+                response = _chat_answer(question, ai)
                 
                 # Generate speech
                 with st.spinner("Generating speech..."):
-                    audio_bytes = voice.text_to_speech(response, voice=voice_type)
+                    audio_bytes = _speech_for(response, voice_type, voice)
                 
                 if audio_bytes:
                     # Display response text
@@ -114,8 +196,7 @@ def create_simple_voice_interface(db, ai):
                     
                     # Display audio player
                     st.markdown("### 🔊 Listen to Response:")
-                    audio_html = voice.create_audio_player(audio_bytes)
-                    st.markdown(audio_html, unsafe_allow_html=True)
+                    voice.play_audio(audio_bytes)
                     
                     # Save to history
                     st.session_state.voice_history.append({
@@ -152,7 +233,6 @@ def create_simple_voice_interface(db, ai):
                 
                 # Regenerate audio button
                 if st.button(f"🔄 Replay", key=f"replay_{i}"):
-                    audio_bytes = voice.text_to_speech(item['response'], voice=item['voice'])
+                    audio_bytes = _speech_for(item['response'], item['voice'], voice)
                     if audio_bytes:
-                        audio_html = voice.create_audio_player(audio_bytes)
-                        st.markdown(audio_html, unsafe_allow_html=True)
\ No newline at end of file
+                        voice.play_audio(audio_bytes)
\ No newline at end of file